@@ -0,0 +1,65 @@
+# Startup cost of a fresh worker process: import time, env creation time
+# and peak resident memory. Every measurement runs in its own interpreter
+# so nothing is already imported or cached.
+#
+#   python benchmarks/startup.py [--repeat 5] [--env RubiksCube-v0]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+WORKER = r'''
+import json, resource, sys, time
+t0 = time.perf_counter()
+import gym
+t1 = time.perf_counter()
+# gym itself may pull in OpenCV when it is installed
+preloaded = {name: name in sys.modules for name in ("cv2", "termcolor")}
+import gym_Rubiks_Cube
+t2 = time.perf_counter()
+env = gym.make(sys.argv[1])
+env.reset()
+env.step(0)
+t3 = time.perf_counter()
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform != "darwin":
+    rss *= 1024
+print(json.dumps({
+    "gym_import": t1 - t0,
+    "package_import": t2 - t1,
+    "make_reset_step": t3 - t2,
+    "max_rss_mb": rss / 2 ** 20,
+    "loaded_by_package": [name for name, pre in preloaded.items() if not pre and name in sys.modules],
+    "loaded_by_gym": [name for name, pre in preloaded.items() if pre],
+}))
+'''
+
+
+def run_once(env_id):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environ = dict(os.environ, PYTHONPATH=root + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    out = subprocess.run([sys.executable, '-c', WORKER, env_id], env=environ,
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--env', default='RubiksCube-v0')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [run_once(args.env) for _ in range(args.repeat)]
+    for key in ('gym_import', 'package_import', 'make_reset_step'):
+        values = [r[key] * 1000 for r in runs]
+        print("%-16s median %8.1f ms   min %8.1f ms" % (key, statistics.median(values), min(values)))
+    print("%-16s median %8.1f MB" % ('max_rss', statistics.median(r['max_rss_mb'] for r in runs)))
+    print("render backends loaded by the package: %s (already loaded by gym: %s)"
+          % (runs[0]['loaded_by_package'] or 'none', runs[0]['loaded_by_gym'] or 'none'))
+
+
+if __name__ == '__main__':
+    main()
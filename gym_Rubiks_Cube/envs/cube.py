@@ -17,10 +17,20 @@
 
 import sys
 import os
+import importlib
 from math import ceil
-from termcolor import colored
 import numpy as np
-import cv2
+
+
+# The terminal-color and OpenCV backends are only needed by the
+# colored/human displays, so they are imported the first time one
+# of those is used. Headless training installs can leave them out.
+def _loadBackend(name):
+    try:
+        return importlib.import_module(name)
+    except ImportError as e:
+        raise ImportError("%s is needed for this display mode, "
+                          "install it with: pip install gym_Rubiks_Cube[render]" % name) from e
 
 
 # This is the cube class. It can generalize
@@ -120,6 +130,7 @@ class Cube:
 
     def getTileColor(self, tile, isColor=False):
         if isColor:
+            colored = _loadBackend('termcolor').colored
             tile = colored(Cube.tileCharReal, Cube.colorDict[tile],
                            attrs=['reverse', 'blink'])
         return tile
@@ -453,6 +464,7 @@ class Cube:
         if mode == 'rgb_array':
             return render_array
         else:
+            cv2 = _loadBackend('cv2')
             img = cv2.cvtColor(render_array, cv2.COLOR_BGR2RGB)
             img = cv2.resize(img, (600, 300), interpolation=cv2.INTER_NEAREST)
             cv2.imshow("Cube", np.array(img))
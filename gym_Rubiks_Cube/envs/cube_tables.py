@@ -0,0 +1,371 @@
+import functools
+from collections import deque
+
+import numpy as np
+
+from gym_Rubiks_Cube.envs import cube
+
+actionList = [
+    'f', 'r', 'l', 'u', 'd', 'b',
+    '.f', '.r', '.l', '.u', '.d', '.b']
+
+# Half turns are two quarter turns in one action.
+halfTurnList = actionList + ['ff', 'rr', 'll', 'uu', 'dd', 'bb']
+
+# Middle slices (3x3 only), named by the layer prefix minimalInterpreter
+# takes. '2b', '2l' and '2d' turn the same slices as '2f', '2r' and '2u'
+# the other way, so they stand in for the inverses.
+sliceList = halfTurnList + ['2f', '2r', '2u', '2b', '2l', '2d', '2f2f', '2r2r', '2u2u']
+
+ACTION_SETS = {
+    'quarter': actionList,
+    'half': halfTurnList,
+    'slice': sliceList,
+}
+
+tileDict = {
+    'R': 0,
+    'O': 1,
+    'Y': 2,
+    'G': 3,
+    'B': 4,
+    'W': 5,
+}
+
+# Faces in the order used by Cube.constructVectorState
+FACE_ORDER = ['Front', 'Back', 'Right', 'Left', 'Up', 'Down']
+FACE_MOVES = ['f', 'r', 'l', 'u', 'd', 'b']
+WHOLE_CUBE_ROTATIONS = ['x', 'y', 'z']
+
+KEY_DTYPE = np.dtype([('corners', '<u8'), ('edges', '<u8')])
+
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+
+# Sticker permutations are read straight off the Cube class, so the tables
+# always agree with what the env does when it calls minimalInterpreter.
+# A permutation p means: new_state[i] = old_state[p[i]].
+@functools.lru_cache(maxsize=None)
+def sticker_permutation(order, cmd):
+    ncube = cube.Cube(order=order)
+    ncube.destructVectorState([str(i) for i in range(6 * order * order)])
+    ncube.minimalInterpreter(cmd)
+    return _readonly(np.array([int(t) for t in ncube.constructVectorState()], dtype=np.intp))
+
+
+def move_table(order, moves=None):
+    """Stack the sticker permutations of ``moves`` into a (len(moves), 6 * order ** 2) array."""
+    if moves is None:
+        moves = actionList
+    return np.stack([sticker_permutation(order, m) for m in moves])
+
+
+@functools.lru_cache(maxsize=None)
+def _redundant_pairs(order, moves):
+    table = move_table(order, moves)
+    rotated = rotations(order)[0]
+    # no move or one move, then or after any whole-cube rotation
+    single = {tuple(p) for p in np.concatenate([table, rotated[:1]])}
+    single = {tuple(np.array(p)[r]) for p in single for r in rotated} | \
+        {tuple(r[np.array(p)]) for p in single for r in rotated}
+    # a then b is table[a][table[b]]
+    out = np.array([[tuple(pa[pb]) in single for pb in table] for pa in table])
+    return _readonly(out)
+
+
+def redundant_pairs(order, moves=None):
+    """(n, n) bool table: ``[a, b]`` is True when ``a`` then ``b`` is no move or a single move.
+
+    A rotated cube is the same puzzle, so this holds up to a whole-cube
+    rotation: on the 2x2 ``f`` then ``.b`` is no move, and on the 3x3 ``f``
+    then ``2f`` is a single ``.b``. With quarter turns on the 3x3 that only
+    pairs each move with its inverse; once half turns are available it
+    covers every pair of turns of the same layer.
+    """
+    return _redundant_pairs(order, tuple(actionList if moves is None else moves))
+
+
+def apply_moves(states, table, actions):
+    """Apply one move per row: ``states`` is (B, S), ``actions`` is (B,)."""
+    rows = np.arange(len(states))[:, None]
+    return states[rows, table[actions]]
+
+
+def expand(states, table):
+    """Every successor of every state, shaped (B, len(table), S)."""
+    return states[:, table]
+
+
+@functools.lru_cache(maxsize=None)
+def solved_state(order):
+    ncube = cube.Cube(order=order)
+    return _readonly(np.array([tileDict[t] for t in ncube.constructVectorState()], dtype=np.uint8))
+
+
+def action_set(name, order=3):
+    """The move list of a named action set."""
+    if name not in ACTION_SETS:
+        raise ValueError("Unknown action set %r, expected one of %s" % (name, sorted(ACTION_SETS)))
+    if name == 'slice' and order != 3:
+        raise ValueError("Slice moves need a 3x3 cube")
+    return ACTION_SETS[name]
+
+
+@functools.lru_cache(maxsize=None)
+def rotation_words(order):
+    """One ``x``/``y``/``z`` command string for each of the 24 whole-cube rotations."""
+    words = {tuple(sticker_permutation(order, '')): ''}
+    queue = deque([''])
+    while queue:
+        word = queue.popleft()
+        for r in WHOLE_CUBE_ROTATIONS:
+            perm = tuple(sticker_permutation(order, word + r))
+            if perm not in words:
+                words[perm] = word + r
+                queue.append(word + r)
+    return tuple(words.values())
+
+
+@functools.lru_cache(maxsize=None)
+def rotations(order):
+    """The 24 whole-cube rotations as sticker permutations plus color maps.
+
+    Conjugating a state by rotation ``k`` is ``colors[k][state[perms[k]]]``;
+    the color map relabels the tiles so the result is again measured against
+    the solved cube.
+    """
+    perms = np.stack([sticker_permutation(order, w) for w in rotation_words(order)])
+    solved = solved_state(order)
+    colors = np.zeros((len(perms), 6), dtype=np.uint8)
+    for k, perm in enumerate(perms):
+        colors[k][solved[perm]] = solved
+    return _readonly(perms), _readonly(colors)
+
+
+class CubieModel:
+    """Corner/edge view of the sticker vector for a given order.
+
+    Stickers are grouped into cubies by which face turns move them. Every
+    cubie position keeps an ordered sticker tuple; corner tuples start on the
+    Up/Down face and share one chirality, so a corner's orientation is the
+    index of its Up/Down colored sticker and twists sum to 0 mod 3.
+
+    Slice moves carry the centers along. Cubies are always read with the
+    whole cube turned so the centers are home, which is the same puzzle.
+    """
+
+    def __init__(self, order):
+        self.order = order
+        self.size = 6 * order * order
+        self.solved = solved_state(order)
+        face = order * order
+        ud = set(range(4 * face, 6 * face))
+
+        perms = {m: sticker_permutation(order, m) for m in FACE_MOVES}
+        groups = {}
+        for p in range(self.size):
+            signature = frozenset(m for m, perm in perms.items() if perm[p] != p)
+            if signature:
+                groups.setdefault(signature, []).append(p)
+        corners = sorted(sorted(g) for g in groups.values() if len(g) == 3)
+        edges = sorted(sorted(g) for g in groups.values() if len(g) == 2)
+        self.centers = np.array(sorted(set(range(self.size)) - {p for g in groups.values() for p in g}),
+                                dtype=np.intp)
+
+        self.corners = self._orient_corners(corners, ud)
+        self.edges = np.array([sorted(g, key=lambda p: (p not in ud, p)) for g in edges],
+                              dtype=np.intp).reshape(-1, 2)
+        self.num_corners = len(self.corners)
+        self.num_edges = len(self.edges)
+
+        self.corner_colors = self.solved[self.corners]
+        self.edge_colors = self.solved[self.edges]
+        self._corner_lut = self._lookup(self.corner_colors)
+        self._edge_lut = self._lookup(self.edge_colors)
+
+    def _orient_corners(self, corners, ud):
+        owner = {p: i for i, g in enumerate(corners) for p in g}
+        inverses = [np.argsort(sticker_permutation(self.order, m)) for m in actionList]
+
+        def ud_first(t):
+            k = next(i for i, p in enumerate(t) if p in ud)
+            return t[k:] + t[:k]
+
+        tuples = {0: ud_first(tuple(corners[0]))}
+        queue = deque([0])
+        while queue:
+            tup = tuples[queue.popleft()]
+            for inv in inverses:
+                image = ud_first(tuple(int(inv[p]) for p in tup))
+                q = owner[image[0]]
+                if q not in tuples:
+                    tuples[q] = image
+                    queue.append(q)
+        return np.array([tuples[i] for i in range(len(corners))], dtype=np.intp)
+
+    @staticmethod
+    def _lookup(colors):
+        # tile code tuple -> (cubie, orientation); 255 marks impossible codes
+        width = colors.shape[1]
+        lut = np.full((6 ** width, 2), 255, dtype=np.uint8)
+        for cubie, tiles in enumerate(colors):
+            for ori in range(width):
+                code = 0
+                for k in range(width):
+                    code = code * 6 + int(tiles[(k - ori) % width])
+                lut[code] = cubie, ori
+        return lut
+
+    @staticmethod
+    def _codes(states, tuples):
+        code = np.zeros(states.shape[:1] + tuples.shape[:1], dtype=np.intp)
+        for k in range(tuples.shape[1]):
+            code = code * 6 + states[:, tuples[:, k]]
+        return code
+
+    def reorient(self, states):
+        """Turn each (B, S) state as a whole so its centers are home."""
+        off = (states[:, self.centers] != self.solved[self.centers]).any(axis=1)
+        if not off.any():
+            return states
+        states = states.copy()
+        for perm in rotations(self.order)[0]:
+            rows = np.flatnonzero(off)
+            turned = states[rows][:, perm]
+            home = (turned[:, self.centers] == self.solved[self.centers]).all(axis=1)
+            states[rows[home]] = turned[home]
+            off[rows[home]] = False
+        return states
+
+    def encode(self, states):
+        """Split (B, S) sticker states into ``(cp, co, ep, eo)`` uint8 arrays."""
+        states = self.reorient(np.asarray(states).reshape(-1, self.size))
+        corner = self._corner_lut[self._codes(states, self.corners)]
+        edge = self._edge_lut[self._codes(states, self.edges)]
+        return corner[..., 0], corner[..., 1], edge[..., 0], edge[..., 1]
+
+    def decode(self, cp, co, ep, eo):
+        """Inverse of ``encode``: rebuild (B, S) sticker states."""
+        states = np.empty((len(cp), self.size), dtype=np.uint8)
+        states[:, self.centers] = self.solved[self.centers]
+        for tuples, colors, perm, ori in ((self.corners, self.corner_colors, cp, co),
+                                          (self.edges, self.edge_colors, ep, eo)):
+            width = tuples.shape[1]
+            for k in range(width):
+                states[:, tuples[:, k]] = colors[perm, (k - ori.astype(np.intp)) % width]
+        return states
+
+    @functools.lru_cache(maxsize=None)
+    def move(self, cmd):
+        """Cubie form of a move: ``(corner_src, corner_twist, edge_src, edge_flip)``."""
+        perm = sticker_permutation(self.order, cmd)
+        if (perm[self.centers] != self.centers).any():
+            # follow a slice move with the rotation that brings the centers home
+            cmd = next(cmd + w for w in rotation_words(self.order)
+                       if (sticker_permutation(self.order, cmd + w)[self.centers] == self.centers).all())
+        inv = np.argsort(sticker_permutation(self.order, cmd))
+        out = []
+        for tuples in (self.corners, self.edges):
+            owner = {int(p): (i, k) for i, t in enumerate(tuples) for k, p in enumerate(t)}
+            src = np.zeros(len(tuples), dtype=np.intp)
+            twist = np.zeros(len(tuples), dtype=np.uint8)
+            for i, t in enumerate(tuples):
+                q, k = owner[int(inv[t[0]])]
+                src[q] = i
+                twist[q] = k
+            out.extend([_readonly(src), _readonly(twist)])
+        return tuple(out)
+
+    def apply(self, cp, co, ep, eo, cmd):
+        csrc, ctwist, esrc, eflip = self.move(cmd)
+        return (cp[:, csrc], (co[:, csrc] + ctwist) % 3,
+                ep[:, esrc], (eo[:, esrc] + eflip) % 2)
+
+    def keys(self, states):
+        """Compact (corners, edges) uint64 keys, one per state row."""
+        cp, co, ep, eo = self.encode(states)
+        out = np.empty(len(cp), dtype=KEY_DTYPE)
+        out['corners'] = perm_rank(cp) * np.uint64(3 ** (self.num_corners - 1)) + digits_rank(co[:, :-1], 3)
+        if self.num_edges:
+            out['edges'] = perm_rank(ep) * np.uint64(2 ** (self.num_edges - 1)) + digits_rank(eo[:, :-1], 2)
+        else:
+            out['edges'] = 0
+        return out
+
+    def canonical_keys(self, states):
+        """Smallest key over the 24 rotational conjugates of each state."""
+        states = np.asarray(states).reshape(-1, self.size)
+        perms, colors = rotations(self.order)
+        best = None
+        for perm, color in zip(perms, colors):
+            keys = self.keys(color[states[:, perm]])
+            if best is None:
+                best = keys
+            else:
+                smaller = (keys['corners'] < best['corners']) | (
+                    (keys['corners'] == best['corners']) & (keys['edges'] < best['edges']))
+                best[smaller] = keys[smaller]
+        return best
+
+
+@functools.lru_cache(maxsize=None)
+def cubie_model(order):
+    return CubieModel(order)
+
+
+def perm_rank(perms, n=None):
+    """Lehmer rank of each row of a (B, k) array of distinct values in [0, n).
+
+    With ``k == n`` (the default) this ranks full permutations; with
+    ``k < n`` it ranks ordered placements, as used by partial patterns.
+    """
+    perms = np.asarray(perms)
+    k = perms.shape[1]
+    if n is None:
+        n = k
+    rank = np.zeros(len(perms), dtype=np.uint64)
+    for i in range(k):
+        used = (perms[:, :i] < perms[:, i:i + 1]).sum(axis=1)
+        digit = perms[:, i].astype(np.int64) - used
+        rank = rank * np.uint64(n - i) + digit.astype(np.uint64)
+    return rank
+
+
+def perm_unrank(ranks, n, k=None):
+    """Inverse of ``perm_rank``."""
+    if k is None:
+        k = n
+    ranks = np.asarray(ranks, dtype=np.uint64).copy()
+    digits = np.zeros((len(ranks), k), dtype=np.intp)
+    for i in range(k - 1, -1, -1):
+        base = np.uint64(n - i)
+        digits[:, i] = ranks % base
+        ranks //= base
+    available = np.tile(np.arange(n), (len(digits), 1))
+    perms = np.zeros((len(digits), k), dtype=np.uint8)
+    rows = np.arange(len(digits))
+    for i in range(k):
+        perms[:, i] = available[rows, digits[:, i]]
+        # drop the chosen element, shifting the tail left
+        keep = np.arange(n - i - 1)[None, :]
+        available = np.where(keep < digits[:, i:i + 1], available[:, :-1], available[:, 1:])
+    return perms
+
+
+def digits_rank(digits, base):
+    rank = np.zeros(len(digits), dtype=np.uint64)
+    for i in range(digits.shape[1]):
+        rank = rank * np.uint64(base) + digits[:, i].astype(np.uint64)
+    return rank
+
+
+def digits_unrank(ranks, base, width):
+    ranks = np.asarray(ranks, dtype=np.uint64).copy()
+    digits = np.zeros((len(ranks), width), dtype=np.uint8)
+    for i in range(width - 1, -1, -1):
+        digits[:, i] = ranks % np.uint64(base)
+        ranks //= np.uint64(base)
+    return digits
@@ -0,0 +1,168 @@
+import functools
+import os
+import tempfile
+import numpy as np
+
+from gym_Rubiks_Cube.envs import cube_tables
+
+# 7! placements of the free corners times 3^6 free twists
+NUM_STATES = 3674160
+
+
+class Indexer2x2:
+    """Numbers the 3,674,160 2x2 states from 0 to ``NUM_STATES - 1``.
+
+    Turning a face and turning the opposite face the other way give the
+    same puzzle seen from a different side, so states are taken up to
+    whole-cube rotation: the cube is always held with the reference corner
+    (cubie 7) home and untwisted, and every move is followed by the rotation
+    that puts it back. Observations produced from an index show the cube
+    held that way.
+    """
+
+    REFERENCE = 7
+
+    def __init__(self, moves=None):
+        self.moves = list(cube_tables.actionList if moves is None else moves)
+        self.model = cube_tables.cubie_model(2)
+        words = cube_tables.rotation_words(2)
+        self.rotation_perms = np.stack([cube_tables.sticker_permutation(2, w) for w in words])
+
+        # each move followed by the rotation that brings the reference corner home
+        self.src = np.zeros((len(self.moves), 7), dtype=np.intp)
+        self.twist = np.zeros((len(self.moves), 7), dtype=np.uint8)
+        for m, cmd in enumerate(self.moves):
+            for word in words:
+                csrc, ctwist = self.model.move(cmd + word)[:2]
+                if csrc[self.REFERENCE] == self.REFERENCE and ctwist[self.REFERENCE] == 0:
+                    self.src[m], self.twist[m] = csrc[:7], ctwist[:7]
+                    break
+            else:
+                raise ValueError("Move %r cannot be re-anchored by a rotation" % cmd)
+        self.solved_index = int(self.rank(np.arange(7, dtype=np.uint8)[None], np.zeros((1, 7), np.uint8))[0])
+
+    @staticmethod
+    def rank(cp, co):
+        """Index of the first seven corners of anchored cubie arrays."""
+        return cube_tables.perm_rank(cp[:, :7]) * np.uint64(729) + cube_tables.digits_rank(co[:, :6], 3)
+
+    @staticmethod
+    def unrank(index):
+        index = np.asarray(index, dtype=np.uint64)
+        cp = np.empty((len(index), 8), dtype=np.uint8)
+        co = np.zeros((len(index), 8), dtype=np.uint8)
+        cp[:, :7] = cube_tables.perm_unrank(index // np.uint64(729), 7)
+        cp[:, 7] = 7
+        co[:, :6] = cube_tables.digits_unrank(index % np.uint64(729), 3, 6)
+        co[:, 6] = (-co[:, :6].sum(axis=1, dtype=np.intp)) % 3
+        return cp, co
+
+    def index_of(self, states):
+        """Index of (B, 24) sticker states, whichever way the cube is held."""
+        states = np.asarray(states, dtype=np.uint8).reshape(-1, self.model.size)
+        out = np.zeros(len(states), dtype=np.int64)
+        for perm in self.rotation_perms:
+            cp, co, _, _ = self.model.encode(states[:, perm])
+            home = (cp[:, self.REFERENCE] == self.REFERENCE) & (co[:, self.REFERENCE] == 0)
+            out[home] = self.rank(cp[home], co[home]).astype(np.int64)
+        return out
+
+    def states_of(self, index):
+        """(B, 24) observations for an array of indices."""
+        cp, co = self.unrank(np.atleast_1d(index))
+        empty = np.zeros((len(cp), 0), dtype=np.uint8)
+        return self.model.decode(cp, co, empty, empty)
+
+    def build_transitions(self, chunk_size=1 << 20):
+        """The ``(NUM_STATES, len(moves))`` int32 next-state table."""
+        table = np.empty((NUM_STATES, len(self.moves)), dtype=np.int32)
+        for start in range(0, NUM_STATES, chunk_size):
+            index = np.arange(start, min(start + chunk_size, NUM_STATES))
+            cp, co = self.unrank(index)
+            for m in range(len(self.moves)):
+                ncp = cp[:, self.src[m]]
+                nco = (co[:, self.src[m]] + self.twist[m]) % 3
+                table[index, m] = self.rank(ncp, nco)
+        return table
+
+    def build_observations(self, chunk_size=1 << 20):
+        """The ``(NUM_STATES, 24)`` uint8 observation of every index."""
+        table = np.empty((NUM_STATES, self.model.size), dtype=np.uint8)
+        for start in range(0, NUM_STATES, chunk_size):
+            index = np.arange(start, min(start + chunk_size, NUM_STATES))
+            table[index] = self.states_of(index)
+        return table
+
+
+@functools.lru_cache(maxsize=None)
+def indexer(action_set='quarter'):
+    return Indexer2x2(cube_tables.action_set(action_set, order=2))
+
+
+def default_table_path():
+    """``$GYM_RUBIKS_CUBE_CACHE``, or ``gym_Rubiks_Cube`` under the user cache directory."""
+    if os.environ.get('GYM_RUBIKS_CUBE_CACHE'):
+        return os.environ['GYM_RUBIKS_CUBE_CACHE']
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache, 'gym_Rubiks_Cube')
+
+
+@functools.lru_cache(maxsize=None)
+def load_tables(path=None, action_set='quarter'):
+    """``(transitions, observations)`` for an action set, memory-mapped from ``path``.
+
+    ``transitions`` is the (NUM_STATES, number of moves) int32 next-state
+    table and ``observations`` the (NUM_STATES, 24) uint8 observation of
+    every index. Both are built and saved in the ``path`` directory
+    (``default_table_path()`` when not given) the first time it is used, so
+    later processes only map them.
+    """
+    if path is None:
+        path = default_table_path()
+    suffix = '' if action_set == 'quarter' else '_' + action_set
+    builders = (('transitions%s.npy' % suffix, lambda: indexer(action_set).build_transitions()),
+                ('observations.npy', lambda: indexer(action_set).build_observations()))
+    os.makedirs(path, exist_ok=True)
+    tables = []
+    for name, build in builders:
+        filename = os.path.join(path, name)
+        if not os.path.exists(filename):
+            # a private temporary file per process, so workers starting
+            # together each move a complete table into place
+            fd, tmp = tempfile.mkstemp(suffix='.npy', dir=path)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.save(f, build())
+                os.chmod(tmp, 0o644)  # mkstemp makes it private
+                os.replace(tmp, filename)
+            except BaseException:
+                os.remove(tmp)
+                raise
+        tables.append(np.load(filename, mmap_mode='r'))
+    return tuple(tables)
+
+
+def q_iteration(transitions, goal, gamma=0.99, max_sweeps=100):
+    """Exact Q-values of the env's reward over the whole indexed space.
+
+    Reaching ``goal`` pays 1 and ends the episode, everything else pays 0.
+    Sweeps are full vectorized Bellman backups and stop once nothing
+    changes, which happens after (diameter + 1) sweeps.
+    """
+    transitions = np.asarray(transitions)
+    solved = transitions == goal
+    reward = solved.astype(np.float32)
+    values = np.zeros(len(transitions), dtype=np.float32)
+    q = reward
+    for _ in range(max_sweeps):
+        q = reward + np.float32(gamma) * np.where(solved, np.float32(0), values[transitions])
+        new_values = q.max(axis=1)
+        if np.array_equal(new_values, values):
+            break
+        values = new_values
+    return q
+
+
+def value_iteration(transitions, goal, gamma=0.99, max_sweeps=100):
+    """State values ``max_a Q(s, a)``; see ``q_iteration``."""
+    return q_iteration(transitions, goal, gamma, max_sweeps).max(axis=1)
@@ -0,0 +1,156 @@
+import json
+import os
+
+import numpy as np
+
+from gym_Rubiks_Cube.envs import cube_tables
+
+UNKNOWN = -1
+
+_META = 'meta.json'
+_KEYS = 'keys.npy'
+_DISTANCES = 'distances.npy'
+
+
+def pack_nibbles(values):
+    """Pack values in [0, 15] two per byte, low nibble first."""
+    values = np.asarray(values, dtype=np.uint8)
+    if len(values) % 2:
+        values = np.append(values, np.uint8(0xF))
+    return values[0::2] | (values[1::2] << 4)
+
+
+def unpack_nibbles(packed, index):
+    index = np.asarray(index, dtype=np.intp)
+    byte = np.asarray(packed[index >> 1])
+    return np.where(index & 1, byte >> 4, byte & 0xF)
+
+
+def _sorted_member(sorted_keys, keys):
+    """Position of each key in ``sorted_keys`` and whether it is actually there."""
+    if len(sorted_keys) == 0:
+        return np.zeros(len(keys), dtype=np.intp), np.zeros(len(keys), dtype=bool)
+    pos = np.searchsorted(sorted_keys, keys)
+    pos = np.minimum(pos, len(sorted_keys) - 1)
+    return pos, sorted_keys[pos] == keys
+
+
+def _next_layer(states, table, keyfn, seen, chunk_size):
+    """Unique successors of ``states`` whose keys are not in the sorted ``seen``."""
+    new_states, new_keys = [], []
+    step = max(1, chunk_size // len(table))
+    for start in range(0, len(states), step):
+        children = cube_tables.expand(states[start:start + step], table).reshape(-1, states.shape[1])
+        keys = keyfn(children)
+        keys, index = np.unique(keys, return_index=True)
+        fresh = ~_sorted_member(seen, keys)[1]
+        new_states.append(children[index[fresh]])
+        new_keys.append(keys[fresh])
+    keys, index = np.unique(np.concatenate(new_keys), return_index=True)
+    return np.concatenate(new_states)[index], keys
+
+
+def _closed_under_rotations(model, table):
+    perms, colors = cube_tables.rotations(model.order)
+    one_move = cube_tables.expand(model.solved[None], table)[0]
+    keys = np.sort(model.keys(one_move))
+    for perm, color in zip(perms, colors):
+        if not np.array_equal(np.sort(model.keys(color[one_move[:, perm]])), keys):
+            return False
+    return True
+
+
+def build_neighborhood(path, radius, order=3, moves=None, chunk_size=1 << 20):
+    """Breadth-first search out to ``radius`` moves from solved and save it under ``path``.
+
+    States are stored once per rotational symmetry class as a sorted array of
+    ``cube_tables.KEY_DTYPE`` keys, with distances packed into nibbles beside
+    it. Both files are plain ``.npy`` so they can be memory-mapped on load.
+    """
+    if not 0 <= radius < 0xF:
+        raise ValueError("radius must be between 0 and 14")
+    if moves is None:
+        moves = cube_tables.actionList
+    model = cube_tables.cubie_model(order)
+    table = cube_tables.move_table(order, moves)
+    if not _closed_under_rotations(model, table):
+        raise ValueError("Move set must be closed under whole-cube rotations")
+
+    frontier = model.solved[None].copy()
+    seen = model.canonical_keys(frontier)
+    layers = [seen]
+    for depth in range(1, radius + 1):
+        frontier, keys = _next_layer(frontier, table, model.canonical_keys, seen, chunk_size)
+        if len(keys) == 0:
+            break
+        layers.append(keys)
+        seen = np.sort(np.concatenate([seen, keys]))
+
+    keys = np.concatenate(layers)
+    distances = np.concatenate([np.full(len(k), d, dtype=np.uint8) for d, k in enumerate(layers)])
+    order_index = np.argsort(keys, kind='stable')
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, _KEYS), keys[order_index])
+    np.save(os.path.join(path, _DISTANCES), pack_nibbles(distances[order_index]))
+    with open(os.path.join(path, _META), 'w') as f:
+        json.dump({'order': order, 'radius': radius, 'moves': list(moves),
+                   'layers': [len(k) for k in layers]}, f)
+    return NeighborhoodIndex(path)
+
+
+class NeighborhoodIndex:
+    """Exact distances for every state within ``radius`` moves of solved.
+
+    Lookups take (B, 6 * order ** 2) observation arrays as produced by
+    ``RubiksCubeEnv`` and binary-search the memory-mapped key array.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, _META)) as f:
+            meta = json.load(f)
+        self.order = meta['order']
+        self.radius = meta['radius']
+        self.moves = meta['moves']
+        self.layer_sizes = meta['layers']
+        self.keys = np.load(os.path.join(path, _KEYS), mmap_mode='r')
+        self.distances = np.load(os.path.join(path, _DISTANCES), mmap_mode='r')
+        self.model = cube_tables.cubie_model(self.order)
+        self.table = cube_tables.move_table(self.order, self.moves)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def distance(self, states):
+        """Distance to solved for each state, or ``UNKNOWN`` beyond the radius."""
+        keys = self.model.canonical_keys(states)
+        pos, found = _sorted_member(self.keys, keys)
+        out = np.full(len(keys), UNKNOWN, dtype=np.int16)
+        out[found] = unpack_nibbles(self.distances, pos[found])
+        return out
+
+    def solve_distance(self, state, max_depth=None, chunk_size=1 << 20):
+        """Exact distance of a single state up to twice the radius.
+
+        Searches outwards from ``state`` and meets the stored ball around
+        solved. The first layer ``k`` with a state ``x`` in the index gives
+        the answer ``k + min distance(x)``: no earlier layer reached the
+        ball, so the distance is at least ``k + radius``. Returns
+        ``UNKNOWN`` when the state is further than ``max_depth`` (default
+        ``2 * radius``).
+        """
+        if max_depth is None:
+            max_depth = 2 * self.radius
+        frontier = np.asarray(state, dtype=np.uint8).reshape(1, -1)
+        seen = self.model.keys(frontier)
+        outer = max(max_depth - self.radius, 0)
+        for k in range(outer + 1):
+            dist = self.distance(frontier)
+            dist = dist[dist != UNKNOWN]
+            if len(dist):
+                best = k + int(dist.min())
+                return best if best <= max_depth else UNKNOWN
+            if k < outer:
+                frontier, keys = _next_layer(frontier, self.table, self.model.keys, seen, chunk_size)
+                seen = np.sort(np.concatenate([seen, keys]))
+        return UNKNOWN
@@ -0,0 +1,226 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import factorial
+
+import numpy as np
+
+from gym_Rubiks_Cube.envs import cube_tables
+from gym_Rubiks_Cube.envs.neighborhood import pack_nibbles, unpack_nibbles
+
+UNVISITED = 0xFF
+
+_META = 'meta.json'
+
+# Two disjoint six-edge patterns; 42,577,920 entries each.
+DEFAULT_EDGE_GROUPS = ((0, 1, 2, 3, 4, 5), (6, 7, 8, 9, 10, 11))
+
+
+class PatternSpec:
+    """Ranks the positions and orientations of a subset of cubies.
+
+    ``kind`` is ``'corners'`` or ``'edges'`` and ``pieces`` lists the cubie
+    ids being tracked (a cubie id is its home position in ``CubieModel``).
+    Everything else on the cube is ignored, so the distance of a pattern is
+    a lower bound on the distance of any cube showing it.
+    """
+
+    def __init__(self, order, kind, pieces, moves=None):
+        self.order = order
+        self.kind = kind
+        self.pieces = np.array(pieces, dtype=np.intp)
+        self.moves = list(cube_tables.actionList if moves is None else moves)
+        model = cube_tables.cubie_model(order)
+        if kind == 'corners':
+            self.slots, self.base, offset = model.num_corners, 3, 0
+        elif kind == 'edges':
+            self.slots, self.base, offset = model.num_edges, 2, 2
+        else:
+            raise ValueError("kind must be 'corners' or 'edges'")
+        k = len(self.pieces)
+        # orientations always sum to zero when every cubie is tracked
+        self.free_orientations = k - 1 if k == self.slots else k
+        self.num_placements = factorial(self.slots) // factorial(self.slots - k)
+        self.size = self.num_placements * self.base ** self.free_orientations
+
+        # per move: where a cubie at position p goes, and the twist it picks up there
+        self.dest = np.zeros((len(self.moves), self.slots), dtype=np.intp)
+        self.twist = np.zeros((len(self.moves), self.slots), dtype=np.uint8)
+        for m, cmd in enumerate(self.moves):
+            src, twist = model.move(cmd)[offset:offset + 2]
+            self.dest[m][src] = np.arange(self.slots)
+            self.twist[m] = twist
+
+    @property
+    def name(self):
+        return '%s_%s' % (self.kind, '-'.join(str(p) for p in self.pieces))
+
+    def rank(self, pos, ori):
+        """Index of (B, k) piece positions and orientations."""
+        index = cube_tables.perm_rank(pos, self.slots)
+        return index * np.uint64(self.base ** self.free_orientations) + \
+            cube_tables.digits_rank(ori[:, :self.free_orientations], self.base)
+
+    def unrank(self, index):
+        index = np.asarray(index, dtype=np.uint64)
+        scale = np.uint64(self.base ** self.free_orientations)
+        pos = cube_tables.perm_unrank(index // scale, self.slots, len(self.pieces))
+        ori = np.zeros(pos.shape, dtype=np.uint8)
+        ori[:, :self.free_orientations] = cube_tables.digits_unrank(
+            index % scale, self.base, self.free_orientations)
+        if self.free_orientations < len(self.pieces):
+            ori[:, -1] = (-ori[:, :-1].sum(axis=1, dtype=np.intp)) % self.base
+        return pos, ori
+
+    def successors(self, index):
+        """(B, len(moves)) indices one move away."""
+        pos, ori = self.unrank(index)
+        out = np.empty((len(pos), len(self.moves)), dtype=np.uint64)
+        for m in range(len(self.moves)):
+            new_pos = self.dest[m][pos]
+            out[:, m] = self.rank(new_pos, (ori + self.twist[m][new_pos]) % self.base)
+        return out
+
+    def index_of(self, cp, co, ep, eo):
+        """Pattern index of cubie arrays as returned by ``CubieModel.encode``."""
+        perm, orient = (cp, co) if self.kind == 'corners' else (ep, eo)
+        where = np.argsort(perm, axis=1)[:, self.pieces]
+        return self.rank(where, np.take_along_axis(orient, where, axis=1))
+
+
+# Worker side of the parallel BFS. Each process maps the shared working
+# table once; writes only ever turn UNVISITED into depth + 1, so concurrent
+# workers may race on a byte but always agree on the value.
+_worker = {}
+
+
+def _init_worker(order, kind, pieces, moves, work_path):
+    _worker['spec'] = PatternSpec(order, kind, pieces, moves)
+    _worker['table'] = np.load(work_path, mmap_mode='r+')
+
+
+def _forward_chunk(start, stop, depth):
+    spec, table = _worker['spec'], _worker['table']
+    frontier = np.flatnonzero(table[start:stop] == depth).astype(np.uint64) + np.uint64(start)
+    if len(frontier) == 0:
+        return
+    children = np.unique(spec.successors(frontier))
+    children = children[table[children] == UNVISITED]
+    table[children] = depth + 1
+
+
+def _backward_chunk(start, stop, depth):
+    spec, table = _worker['spec'], _worker['table']
+    todo = np.flatnonzero(table[start:stop] == UNVISITED).astype(np.uint64) + np.uint64(start)
+    if len(todo) == 0:
+        return
+    hit = (table[spec.successors(todo)] == depth).any(axis=1)
+    table[todo[hit]] = depth + 1
+
+
+def _bfs(spec, work_path, processes, chunk_size):
+    table = np.lib.format.open_memmap(work_path, mode='w+', dtype=np.uint8, shape=(spec.size,))
+    table[:] = UNVISITED
+    solved = spec.rank(spec.pieces[None], np.zeros((1, len(spec.pieces)), dtype=np.uint8))
+    table[int(solved[0])] = 0
+    table.flush()
+
+    chunks = [(lo, min(lo + chunk_size, spec.size)) for lo in range(0, spec.size, chunk_size)]
+    init_args = (spec.order, spec.kind, spec.pieces.tolist(), spec.moves, work_path)
+    counts = [1]
+    if processes == 1:
+        _init_worker(*init_args)
+        run = lambda fn, depth: [fn(lo, hi, depth) for lo, hi in chunks]  # noqa: E731
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(processes, initializer=_init_worker, initargs=init_args)
+        run = lambda fn, depth: list(pool.map(fn, *zip(*chunks), [depth] * len(chunks)))  # noqa: E731
+    try:
+        remaining = spec.size - 1
+        depth = 0
+        while remaining:
+            # 0xF pads the packed table, so depths have to stay below it
+            if depth + 1 >= 0xF:
+                raise RuntimeError("Pattern depth does not fit in a nibble")
+            # go backwards once the unvisited entries are fewer than the
+            # frontier; fine because every move's inverse is also a move
+            fn = _backward_chunk if remaining < counts[-1] else _forward_chunk
+            run(fn, depth)
+            # workers may both claim a child, so count in one place
+            found = int(np.count_nonzero(table == depth + 1))
+            if found == 0:
+                break
+            counts.append(found)
+            remaining -= found
+            depth += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        _worker.clear()
+    return np.load(work_path, mmap_mode='r'), counts
+
+
+def build_pattern_databases(path, order=3, edge_groups=DEFAULT_EDGE_GROUPS, moves=None,
+                            processes=None, chunk_size=1 << 18):
+    """Build the corner and edge pattern databases under ``path``.
+
+    Every table is filled by a breadth-first search over pattern indices,
+    split into chunks that run on a process pool (``processes=None`` uses
+    every CPU). The finished tables hold one distance per nibble and are
+    saved as ``.npy`` files that ``PatternDatabase`` maps lazily.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    model = cube_tables.cubie_model(order)
+    specs = [PatternSpec(order, 'corners', range(model.num_corners), moves)]
+    if model.num_edges:
+        specs += [PatternSpec(order, 'edges', group, moves) for group in edge_groups]
+
+    os.makedirs(path, exist_ok=True)
+    meta = {'order': order, 'moves': specs[0].moves, 'tables': []}
+    for spec in specs:
+        filename = spec.name + '.npy'
+        work_path = os.path.join(path, spec.name + '.work.npy')
+        table, counts = _bfs(spec, work_path, processes, chunk_size)
+        np.save(os.path.join(path, filename), pack_nibbles(table))
+        del table
+        os.remove(work_path)
+        meta['tables'].append({'kind': spec.kind, 'pieces': spec.pieces.tolist(), 'file': filename,
+                               'size': spec.size, 'layers': counts})
+    with open(os.path.join(path, _META), 'w') as f:
+        json.dump(meta, f)
+    return PatternDatabase(path)
+
+
+class PatternDatabase:
+    """Admissible heuristic: the largest of the corner and edge pattern distances.
+
+    Tables are memory-mapped the first time they are needed, so opening a
+    database is cheap and worker processes share the page cache.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, _META)) as f:
+            meta = json.load(f)
+        self.order = meta['order']
+        self.moves = meta['moves']
+        self.specs = [PatternSpec(self.order, t['kind'], t['pieces'], self.moves) for t in meta['tables']]
+        self.files = [t['file'] for t in meta['tables']]
+        self.model = cube_tables.cubie_model(self.order)
+        self._tables = [None] * len(self.specs)
+
+    def table(self, i):
+        if self._tables[i] is None:
+            self._tables[i] = np.load(os.path.join(self.path, self.files[i]), mmap_mode='r')
+        return self._tables[i]
+
+    def lookup(self, states):
+        """(len(tables), B) distances of each pattern for (B, S) states."""
+        cubies = self.model.encode(states)
+        return np.stack([unpack_nibbles(self.table(i), spec.index_of(*cubies).astype(np.intp))
+                         for i, spec in enumerate(self.specs)])
+
+    def heuristic(self, states):
+        """Lower bound on the distance to solved for each of the (B, S) states."""
+        return self.lookup(states).max(axis=0)
@@ -1,21 +1,10 @@
 import gym as gym
 from gym import spaces
 import numpy as np
-import random
 from gym_Rubiks_Cube.envs import cube
-
-actionList = [
-    'f', 'r', 'l', 'u', 'd', 'b',
-    '.f', '.r', '.l', '.u', '.d', '.b']
-
-tileDict = {
-    'R': 0,
-    'O': 1,
-    'Y': 2,
-    'G': 3,
-    'B': 4,
-    'W': 5,
-}
+from gym_Rubiks_Cube.envs import cube_tables
+from gym_Rubiks_Cube.envs.scramble import scramble_for
+from gym_Rubiks_Cube.envs.cube_tables import actionList, tileDict
 
 
 class RubiksCubeEnv(gym.Env):
@@ -25,11 +14,18 @@ class RubiksCubeEnv(gym.Env):
         'render_fps': 4
     }
 
-    def __init__(self, render_mode='rgb_array', order_num=3):
-        # the action is 6 move x 2 direction = 12
+    def __init__(self, render_mode='rgb_array', order_num=3, indexed=False, table_path=None,
+                 action_set='quarter'):
+        # 'quarter': 6 move x 2 direction = 12, 'half': + 6 half turns = 18,
+        # 'slice' (3x3 only): + 3 middle slices x 3 = 27
         self.doScramble = None
         self.render_mode = render_mode
-        self.action_space = spaces.Discrete(12)
+        self.action_set = action_set
+        self.moves = cube_tables.action_set(action_set, order_num)
+        self.action_space = spaces.Discrete(len(self.moves))
+        # every move is one precomputed sticker permutation
+        self.move_table = cube_tables.move_table(order_num, self.moves)
+        self.redundant = cube_tables.redundant_pairs(order_num, self.moves)
         # input is 9x6 = 54 array
         self.orderNum = order_num
         low = np.array([0 for i in range(self.orderNum * self.orderNum * 6)])
@@ -39,18 +35,34 @@ class RubiksCubeEnv(gym.Env):
 
         self.scramble_low = 1
         self.scramble_high = 10
+        # scramble #k of a seed is a pure function of (seed, k), see scramble.py
+        self.scramble_seed = None
+        self.episode_index = 0
 
         self.obs = None
         self.scramble_log = None
         self.action_log = None
-        self.ncube = None
+        self.state = None
+
+        # indexed mode (2x2 only): the state is a single integer and each
+        # step is one lookup in a precomputed next-state table. The cube is
+        # re-held after every move (see indexed.Indexer2x2), so actions turn
+        # the faces as they appear in the observation.
+        self.indexed = indexed
+        self.state_index = None
+        if indexed:
+            if order_num != 2:
+                raise ValueError("Indexed mode is only available for the 2x2 cube")
+            from gym_Rubiks_Cube.envs import indexed as state_index
+            self.indexer = state_index.indexer(action_set)
+            self.transitions, self.observations = state_index.load_tables(table_path, action_set)
 
     def step(self, action):
         self.action_log.append(action)
-        self.ncube.minimalInterpreter(actionList[action])
+        self._applyAction(action)
         self.obs = self._get_obs()
         self.step_count = self.step_count + 1
-        others = {}
+        others = {'action_mask': self.action_mask()}
         reward, done = self.calculateReward()
 
         terminated = done
@@ -61,14 +73,24 @@ class RubiksCubeEnv(gym.Env):
     def calculateReward(self):
         reward = 0
         done = False
-        if self.ncube.isSolved():
+        if self._isSolved():
             reward = 1.0
             done = True
         return reward, done
 
     def reset(self, return_info=None, seed=None, options=None, scramble="auto"):
         super().reset(seed=seed)
-        self.ncube = cube.Cube(order=self.orderNum)
+        if seed is not None:
+            self.scramble_seed = seed
+            self.episode_index = 0
+        elif self.scramble_seed is None:
+            self.scramble_seed = int(self.np_random.integers(2 ** 63))
+        if options and 'episode_index' in options:
+            self.episode_index = options['episode_index']
+        if self.indexed:
+            self.state_index = self.indexer.solved_index
+        else:
+            self.state = cube_tables.solved_state(self.orderNum).copy()
         self.step_count = 0
         self.action_log = []
         self.scramble_log = []
@@ -77,17 +99,45 @@ class RubiksCubeEnv(gym.Env):
             self.scramble()
         elif scramble:
             for i in scramble:
-                action_num = actionList.index(i)
+                action_num = self.moves.index(i)
                 self.scramble_log.append(action_num)
-                self.ncube.minimalInterpreter(actionList[action_num])
+                self._applyAction(action_num)
 
         ob = self._get_obs()
 
         return ob
 
 
+    def _applyAction(self, action):
+        if self.indexed:
+            self.state_index = int(self.transitions[self.state_index, action])
+        else:
+            self.state = self.state[self.move_table[action]]
+
+    def _isSolved(self):
+        if self.indexed:
+            return self.state_index == self.indexer.solved_index
+        faces = self.state.reshape(6, -1)
+        return bool((faces == faces[:, :1]).all())
+
     def _get_obs(self):
-        return np.array([tileDict[i] for i in self.ncube.constructVectorState()], dtype=np.uint8)
+        if self.indexed:
+            return np.array(self.observations[self.state_index])
+        return self.state.copy()
+
+    def action_mask(self):
+        # moves that would undo or merge with the previous one are masked
+        if not self.action_log:
+            return np.ones(self.action_space.n, dtype=bool)
+        return ~self.redundant[self.action_log[-1]]
+
+    @property
+    def ncube(self):
+        # a Cube showing the current state, for its displays
+        tiles = {v: k for k, v in tileDict.items()}
+        ncube = cube.Cube(order=self.orderNum)
+        ncube.destructVectorState([tiles[t] for t in self._get_obs()])
+        return ncube
 
     def render(self, mode='rgb_array', **kwargs):
         return self.ncube.display(self.render_mode)
@@ -98,16 +148,14 @@ class RubiksCubeEnv(gym.Env):
         self.doScramble = do_scramble
 
     def scramble(self):
-        # set the scramber number
-        scramble_num = random.randint(self.scramble_low, self.scramble_high)
-
-        # check if scramble
-        while self.ncube.isSolved():
-            self.scramble_log = []
-            for i in range(scramble_num):
-                action = random.randint(0, 11)
-                self.scramble_log.append(action)
-                self.ncube.minimalInterpreter(actionList[action])
+        # scramble_for redraws (next attempt) any scramble that undoes itself
+        self.scramble_log = scramble_for(self.scramble_seed, self.episode_index,
+                                         self.scramble_low, self.scramble_high,
+                                         self.action_space.n, redundant=self.redundant,
+                                         table=self.move_table)
+        for action in self.scramble_log:
+            self._applyAction(action)
+        self.episode_index += 1
 
     def get_log(self):
         return self.scramble_log, self.action_log
@@ -0,0 +1,109 @@
+import numpy as np
+
+from gym_Rubiks_Cube.envs import cube_tables
+from gym_Rubiks_Cube.envs.search import is_solved
+
+# Philox4x32-10 constants (Salmon et al., "Parallel random numbers: as easy
+# as 1, 2, 3", SC 2011)
+_M0 = np.uint64(0xD2511F53)
+_M1 = np.uint64(0xCD9E8D57)
+_W0 = np.uint32(0x9E3779B9)
+_W1 = np.uint32(0xBB67AE85)
+_LOW = np.uint64(0xFFFFFFFF)
+_ROUNDS = 10
+
+
+def philox4x32(counters, key):
+    """Philox4x32-10 of each (N, 4) uint32 counter row under a two-word key.
+
+    A counter-based generator is a keyed bijection, so block ``c`` of the
+    stream for ``key`` is computed directly, with no state carried between
+    calls.
+    """
+    x = np.array(counters, dtype=np.uint32).reshape(-1, 4).astype(np.uint64)
+    k0, k1 = (np.uint32(k) for k in key)
+    with np.errstate(over='ignore'):
+        for r in range(_ROUNDS):
+            if r:
+                k0, k1 = k0 + _W0, k1 + _W1
+            p0 = _M0 * x[:, 0]
+            p1 = _M1 * x[:, 2]
+            x = np.stack([(p1 >> np.uint64(32)) ^ x[:, 1] ^ np.uint64(k0), p1 & _LOW,
+                          (p0 >> np.uint64(32)) ^ x[:, 3] ^ np.uint64(k1), p0 & _LOW], axis=1)
+    return x.astype(np.uint32)
+
+
+def _bounded(words, n):
+    # multiply-shift maps a 32-bit word onto [0, n)
+    return ((words.astype(np.uint64) * np.uint64(n)) >> np.uint64(32)).astype(np.int64)
+
+
+def _ends_solved(actions, table):
+    """Whether each row of -1 padded ``actions`` brings the cube back to solved."""
+    order = int(round((table.shape[1] // 6) ** 0.5))
+    states = np.repeat(cube_tables.solved_state(order)[None], len(actions), axis=0)
+    for j in range(actions.shape[1]):
+        moving = actions[:, j] >= 0
+        states[moving] = cube_tables.apply_moves(states[moving], table, actions[moving, j])
+    return is_solved(states, order)
+
+
+def scramble_block(seed, episodes, low, high, num_actions=12, attempt=0, redundant=None,
+                   table=None):
+    """Scrambles for a batch of episode numbers in one call.
+
+    Scramble ``k`` of ``seed`` depends only on ``(seed, k, attempt)``, so
+    any worker can produce any episode's scramble without coordination, and
+    disjoint episode ranges never overlap. Returns ``(actions, lengths)``:
+    an (N, high) int64 array padded with -1 past each scramble's length, and
+    the lengths drawn uniformly from ``[low, high]``.
+
+    ``redundant`` is an optional (num_actions, num_actions) bool table, as
+    from ``cube_tables.redundant_pairs``; moves it marks after the previous
+    one are never drawn. With a ``table`` of move permutations, scrambles
+    that end solved are drawn again with the next attempt. ``RubiksCubeEnv``
+    scrambles with ``num_actions=env.action_space.n``,
+    ``redundant=env.redundant`` and ``table=env.move_table``, so pass all
+    three to reproduce its scrambles.
+    """
+    episodes = np.atleast_1d(np.asarray(episodes, dtype=np.uint64))
+    seed = int(seed) & 0xFFFFFFFFFFFFFFFF
+    key = (seed & 0xFFFFFFFF, seed >> 32)
+    blocks = (high + 1 + 3) // 4  # one word for the length, one per move
+
+    counters = np.zeros((len(episodes), blocks, 4), dtype=np.uint32)
+    counters[:, :, 0] = np.arange(blocks, dtype=np.uint32)
+    counters[:, :, 1] = (episodes & np.uint64(0xFFFFFFFF)).astype(np.uint32)[:, None]
+    counters[:, :, 2] = (episodes >> np.uint64(32)).astype(np.uint32)[:, None]
+    counters[:, :, 3] = attempt
+    words = philox4x32(counters.reshape(-1, 4), key).reshape(len(episodes), -1)
+
+    lengths = low + _bounded(words[:, 0], high - low + 1)
+    if redundant is None:
+        actions = _bounded(words[:, 1:high + 1], num_actions)
+    else:
+        # allowed[p] lists the moves that may follow p; the last row is for the first move
+        allowed = ~np.vstack([np.asarray(redundant, dtype=bool), np.zeros(num_actions, dtype=bool)])
+        counts = allowed.sum(axis=1)
+        choices = np.argsort(~allowed, axis=1, kind='stable')
+        actions = np.empty((len(episodes), high), dtype=np.int64)
+        prev = np.full(len(episodes), num_actions)
+        for j in range(high):
+            actions[:, j] = choices[prev, _bounded(words[:, 1 + j], counts[prev])]
+            prev = actions[:, j]
+    actions[np.arange(high)[None, :] >= lengths[:, None]] = -1
+
+    if table is not None and high > 0:
+        todo = np.flatnonzero(_ends_solved(actions, table))
+        while len(todo):
+            attempt += 1
+            actions[todo], lengths[todo] = scramble_block(seed, episodes[todo], low, high, num_actions,
+                                                          attempt, redundant)
+            todo = todo[_ends_solved(actions[todo], table)]
+    return actions, lengths
+
+
+def scramble_for(seed, episode, low, high, num_actions=12, attempt=0, redundant=None, table=None):
+    """The single scramble ``episode`` of ``seed`` as a list of action numbers."""
+    actions, lengths = scramble_block(seed, [episode], low, high, num_actions, attempt, redundant, table)
+    return actions[0, :lengths[0]].tolist()
@@ -0,0 +1,180 @@
+import heapq
+import time
+from collections import namedtuple
+from itertools import compress
+
+import numpy as np
+
+from gym_Rubiks_Cube.envs import cube_tables
+
+SearchResult = namedtuple('SearchResult', ['solution', 'nodes_expanded', 'seconds'])
+SearchResult.__doc__ = """Outcome of a search.
+
+``solution`` is a list of indices into the move list (``actionList`` by
+default), ready to feed to ``env.step``, or ``None`` when the budget ran out.
+"""
+
+
+def is_solved(states, order):
+    """True for every (B, S) state whose faces are each a single color."""
+    faces = np.asarray(states).reshape(len(states), 6, order * order)
+    return (faces == faces[:, :, :1]).all(axis=(1, 2))
+
+
+def _key_bytes(keys):
+    """The keys as a list of ``bytes``, for use in sets and dicts."""
+    return keys.view('V%d' % keys.dtype.itemsize).tolist()
+
+
+class _Tree:
+    """Every generated node, kept in arrays that double in size as they fill."""
+
+    def __init__(self, root, capacity=1024):
+        self.states = np.empty((capacity, root.size), dtype=np.uint8)
+        self.parent = np.empty(capacity, dtype=np.int64)
+        self.action = np.empty(capacity, dtype=np.int64)
+        self.g = np.empty(capacity, dtype=np.int64)
+        self.closed = np.empty(capacity, dtype=bool)
+        self.size = 0
+        self.add(root[None], -1, -1, 0)
+
+    def _grow(self, needed):
+        capacity = len(self.g)
+        while capacity < needed:
+            capacity *= 2
+        for name in ('states', 'parent', 'action', 'g', 'closed'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add(self, states, parent, action, g):
+        if self.size + len(states) > len(self.g):
+            self._grow(self.size + len(states))
+        first, self.size = self.size, self.size + len(states)
+        self.states[first:self.size] = states
+        self.parent[first:self.size] = parent
+        self.action[first:self.size] = action
+        self.g[first:self.size] = g
+        self.closed[first:self.size] = False
+        return np.arange(first, self.size)
+
+    def path(self, node):
+        out = []
+        while self.parent[node] >= 0:
+            out.append(int(self.action[node]))
+            node = self.parent[node]
+        return out[::-1]
+
+
+def batch_weighted_astar(state, heuristic, order=3, weight=0.6, batch_size=1000,
+                         max_nodes=1000000, moves=None):
+    """Batch-weighted A* guided by a learned cost-to-go, as in DeepCubeA.
+
+    Each iteration pops up to ``batch_size`` nodes with the lowest
+    ``weight * g + h``, generates all their successors at once, drops
+    duplicates by compact state key, and scores the new states with a single
+    ``heuristic(observations)`` call. The search stops at the first solved
+    successor, or once ``max_nodes`` nodes have been expanded.
+    """
+    start = time.perf_counter()
+    if moves is None:
+        moves = cube_tables.actionList
+    model = cube_tables.cubie_model(order)
+    table = cube_tables.move_table(order, moves)
+    root = np.asarray(state, dtype=np.uint8).reshape(-1)
+    if is_solved(root[None], order)[0]:
+        return SearchResult([], 0, time.perf_counter() - start)
+
+    tree = _Tree(root)
+    best_g = {_key_bytes(model.keys(root[None]))[0]: 0}
+    heap = [(0.0, 0)]
+    expanded = 0
+    while heap and expanded < max_nodes:
+        batch = []
+        while heap and len(batch) < min(batch_size, max_nodes - expanded):
+            _, node = heapq.heappop(heap)
+            if not tree.closed[node]:
+                tree.closed[node] = True
+                batch.append(node)
+        if not batch:
+            break
+        expanded += len(batch)
+        batch = np.array(batch)
+
+        children = cube_tables.expand(tree.states[batch], table).reshape(-1, root.size)
+        parents = np.repeat(batch, len(moves))
+        actions = np.tile(np.arange(len(moves)), len(batch))
+        child_g = tree.g[parents] + 1
+
+        # one copy of each state in the batch, the one with the lowest g,
+        # and only then compare the survivors with the best g seen so far
+        keys = model.keys(children)
+        index = np.lexsort((child_g,) + tuple(keys[name] for name in keys.dtype.names[::-1]))
+        keys = keys[index]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        keys, index = _key_bytes(keys[first]), index[first]
+        # unseen keys come back as None, which becomes NaN and compares False
+        known = np.array(list(map(best_g.get, keys)), dtype=np.float64)
+        fresh = ~(known <= child_g[index])
+        if not fresh.any():
+            continue
+        keep = index[fresh]
+        best_g.update(zip(compress(keys, fresh.tolist()), child_g[keep].tolist()))
+        children, parents, actions, child_g = children[keep], parents[keep], actions[keep], child_g[keep]
+        ids = tree.add(children, parents, actions, child_g)
+
+        done = np.flatnonzero(is_solved(children, order))
+        if len(done):
+            return SearchResult(tree.path(ids[done[0]]), expanded, time.perf_counter() - start)
+
+        cost = weight * child_g + np.asarray(heuristic(children), dtype=np.float64).reshape(-1)
+        for f, node in zip(cost.tolist(), ids.tolist()):
+            heapq.heappush(heap, (f, node))
+    return SearchResult(None, expanded, time.perf_counter() - start)
+
+
+def beam_search(state, heuristic, order=3, beam_width=1000, max_depth=30, moves=None):
+    """Keep the ``beam_width`` successors with the lowest heuristic at every depth.
+
+    Successors of the whole beam are generated and scored in one batch per
+    depth. Duplicates within the layer, and states already kept in an
+    earlier beam, are removed by compact state key.
+    """
+    start = time.perf_counter()
+    if moves is None:
+        moves = cube_tables.actionList
+    model = cube_tables.cubie_model(order)
+    table = cube_tables.move_table(order, moves)
+    root = np.asarray(state, dtype=np.uint8).reshape(-1)
+    if is_solved(root[None], order)[0]:
+        return SearchResult([], 0, time.perf_counter() - start)
+
+    tree = _Tree(root)
+    seen = set(_key_bytes(model.keys(root[None])))
+    beam = np.array([0])
+    expanded = 0
+    for depth in range(1, max_depth + 1):
+        expanded += len(beam)
+        children = cube_tables.expand(tree.states[beam], table).reshape(-1, root.size)
+        parents = np.repeat(beam, len(moves))
+        actions = np.tile(np.arange(len(moves)), len(beam))
+
+        keys, index = np.unique(model.keys(children), return_index=True)
+        fresh = np.array([key not in seen for key in _key_bytes(keys)], dtype=bool)
+        if not fresh.any():
+            break
+        keys, keep = keys[fresh], index[fresh]
+        children, parents, actions = children[keep], parents[keep], actions[keep]
+
+        done = np.flatnonzero(is_solved(children, order))
+        if len(done):
+            ids = tree.add(children[done[:1]], parents[done[:1]], actions[done[:1]], depth)
+            return SearchResult(tree.path(ids[0]), expanded, time.perf_counter() - start)
+
+        cost = np.asarray(heuristic(children), dtype=np.float64).reshape(-1)
+        best = np.argsort(cost, kind='stable')[:beam_width]
+        seen.update(_key_bytes(keys[best]))
+        beam = tree.add(children[best], parents[best], actions[best], depth)
+    return SearchResult(None, expanded, time.perf_counter() - start)
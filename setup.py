@@ -3,7 +3,11 @@ from setuptools import find_packages
 
 setup(name='gym_Rubiks_Cube',
       version='0.0.1',
-      install_requires=['gym', 'termcolor'],
+      install_requires=['gym', 'numpy'],
+      extras_require={
+          # only needed for render_mode='human' and the colored terminal cube
+          'render': ['termcolor', 'opencv-python'],
+      },
       url="https://github.com/andresmore/gym-Rubiks-Cube",
       new_step_api=True,
       packages=find_packages()
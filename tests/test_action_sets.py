@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from gym_Rubiks_Cube.envs import cube, cube_tables
+from gym_Rubiks_Cube.envs.rubiks_cube_env import RubiksCubeEnv
+
+ORDERED_SETS = [(2, 'quarter'), (2, 'half'), (3, 'quarter'), (3, 'half'), (3, 'slice')]
+
+
+def two_move_observations(env):
+    for a in range(env.action_space.n):
+        for b in range(env.action_space.n):
+            env.reset(scramble=[])
+            env.step(a)
+            obs, _, done, _ = env.step(b)
+            yield a, b, obs, done
+
+
+@pytest.mark.parametrize('order, action_set', ORDERED_SETS)
+def test_pairs_that_solve_are_redundant(order, action_set):
+    env = RubiksCubeEnv(order_num=order, action_set=action_set)
+    for a, b, _, done in two_move_observations(env):
+        assert not done or env.redundant[a, b], (env.moves[a], env.moves[b])
+
+
+@pytest.mark.parametrize('order, action_set', ORDERED_SETS)
+def test_pairs_that_merge_up_to_rotation_are_redundant(order, action_set):
+    env = RubiksCubeEnv(order_num=order, action_set=action_set)
+    solved = cube_tables.solved_state(order)
+    one_move = np.concatenate([solved[None], cube_tables.expand(solved[None], env.move_table)[0]])
+    # every state at most one move from solved, however the cube is held
+    single = {tuple(state[perm]) for state in one_move for perm in cube_tables.rotations(order)[0]}
+    for a, b, obs, _ in two_move_observations(env):
+        assert tuple(obs) not in single or env.redundant[a, b], (env.moves[a], env.moves[b])
+
+
+@pytest.mark.parametrize('order, action_set', ORDERED_SETS)
+def test_step_matches_cube_interpreter(order, action_set):
+    env = RubiksCubeEnv(order_num=order, action_set=action_set)
+    env.reset(scramble=[])
+    reference = cube.Cube(order=order)
+    rng = np.random.default_rng(0)
+    for action in rng.integers(env.action_space.n, size=200):
+        obs = env.step(action)[0]
+        reference.minimalInterpreter(env.moves[action])
+        expected = [cube_tables.tileDict[t] for t in reference.constructVectorState()]
+        np.testing.assert_array_equal(obs, expected)
+
+
+@pytest.mark.parametrize('move, inverse', [('2f', '2b'), ('2r', '2l'), ('2u', '2d')])
+def test_opposite_slices_are_inverses(move, inverse):
+    identity = np.arange(6 * 3 * 3)
+    perm = cube_tables.sticker_permutation(3, move)
+    inv = cube_tables.sticker_permutation(3, inverse)
+    assert not np.array_equal(perm, identity)
+    np.testing.assert_array_equal(perm[inv], identity)
+    np.testing.assert_array_equal(inv[perm], identity)
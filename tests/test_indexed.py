@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from gym_Rubiks_Cube.envs import indexed
+from gym_Rubiks_Cube.envs.rubiks_cube_env import RubiksCubeEnv
+
+# 2x2 positions at each quarter-turn distance from solved
+QUARTER_TURN_DISTANCES = [1, 6, 27, 120, 534, 2256, 8969, 33058, 114149, 360508,
+                          930588, 1350852, 782536, 90280, 276]
+
+
+@pytest.fixture(scope='module')
+def table_path(tmp_path_factory):
+    return str(tmp_path_factory.mktemp('tables'))
+
+
+def test_transition_columns_are_permutations(table_path):
+    transitions, _ = indexed.load_tables(table_path)
+    assert transitions.shape == (indexed.NUM_STATES, 12)
+    for m in range(transitions.shape[1]):
+        counts = np.bincount(transitions[:, m], minlength=indexed.NUM_STATES)
+        assert len(counts) == indexed.NUM_STATES and (counts == 1).all()
+
+
+def test_steps_agree_with_sticker_moves(table_path):
+    env = RubiksCubeEnv(order_num=2, indexed=True, table_path=table_path)
+    indexer = env.indexer
+    obs = env.reset(seed=0)
+    assert indexer.index_of(obs)[0] == env.state_index
+    rng = np.random.default_rng(0)
+    for action in rng.integers(env.action_space.n, size=300):
+        previous = obs
+        obs = env.step(action)[0]
+        assert indexer.index_of(obs)[0] == env.state_index
+        assert indexer.index_of(previous[env.move_table[action]])[0] == env.state_index
+
+
+def test_value_iteration_gives_quarter_turn_distances(table_path):
+    transitions, _ = indexed.load_tables(table_path)
+    goal = indexed.indexer().solved_index
+    gamma = 0.9
+    values = indexed.value_iteration(transitions, goal, gamma=gamma)
+    # a state d >= 1 moves from solved is worth gamma ** (d - 1)
+    distances = np.rint(np.log(values) / np.log(gamma)).astype(np.int64) + 1
+    distances[goal] = 0
+    assert np.bincount(distances).tolist() == QUARTER_TURN_DISTANCES
@@ -0,0 +1,19 @@
+import numpy as np
+
+from gym_Rubiks_Cube.envs import cube_tables
+from gym_Rubiks_Cube.envs.neighborhood import UNKNOWN, build_neighborhood
+
+
+def test_solve_distance_matches_larger_index(tmp_path):
+    small = build_neighborhood(str(tmp_path / 'small'), 2)
+    large = build_neighborhood(str(tmp_path / 'large'), 4)
+    table = cube_tables.move_table(3)
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        state = cube_tables.solved_state(3)
+        for action in rng.integers(len(table), size=rng.integers(1, 5)):
+            state = state[table[action]]
+        expected = large.distance(state[None])[0]
+        assert expected != UNKNOWN
+        assert small.solve_distance(state) == expected
+        assert small.solve_distance(state, max_depth=expected - 1) == UNKNOWN
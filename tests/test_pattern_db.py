@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from gym_Rubiks_Cube.envs import cube_tables
+from gym_Rubiks_Cube.envs.pattern_db import PatternSpec, _bfs
+
+
+def random_states(order, count, length, seed=0):
+    rng = np.random.default_rng(seed)
+    table = cube_tables.move_table(order)
+    states = np.repeat(cube_tables.solved_state(order)[None], count, axis=0)
+    for _ in range(length):
+        states = cube_tables.apply_moves(states, table, rng.integers(len(table), size=count))
+    return states
+
+
+@pytest.mark.parametrize('kind, pieces', [('corners', (0, 1, 2, 3)), ('corners', range(8)),
+                                          ('edges', (0, 1, 2, 3)), ('edges', (6, 7, 8, 9, 10, 11))])
+def test_successors_match_sticker_moves(kind, pieces):
+    model = cube_tables.cubie_model(3)
+    table = cube_tables.move_table(3)
+    spec = PatternSpec(3, kind, pieces)
+    states = random_states(3, 500, 30)
+    successors = spec.successors(spec.index_of(*model.encode(states)))
+    for m in range(len(table)):
+        moved = states[:, table[m]]
+        np.testing.assert_array_equal(successors[:, m], spec.index_of(*model.encode(moved)))
+
+
+def test_small_pattern_is_admissible(tmp_path):
+    model = cube_tables.cubie_model(3)
+    table = cube_tables.move_table(3)
+    spec = PatternSpec(3, 'corners', (0, 1, 2, 3))
+    pattern, counts = _bfs(spec, str(tmp_path / 'work.npy'), 1, 1 << 16)
+    assert sum(counts) == spec.size
+
+    # exact distances by breadth-first search over whole cubes
+    frontier = cube_tables.solved_state(3)[None]
+    seen = {model.keys(frontier)[0].tobytes()}
+    for depth in range(6):
+        h = pattern[spec.index_of(*model.encode(frontier)).astype(np.intp)]
+        assert (h <= depth).all()
+        children = cube_tables.expand(frontier, table).reshape(-1, frontier.shape[1])
+        keys, index = np.unique(model.keys(children), return_index=True)
+        fresh = np.array([key.tobytes() not in seen for key in keys], dtype=bool)
+        seen.update(key.tobytes() for key in keys[fresh])
+        frontier = children[index[fresh]]
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from gym_Rubiks_Cube.envs.neighborhood import UNKNOWN, build_neighborhood
+from gym_Rubiks_Cube.envs.rubiks_cube_env import RubiksCubeEnv
+from gym_Rubiks_Cube.envs.search import batch_weighted_astar, beam_search
+
+# radius of the distance index used as heuristic, per action set
+RADIUS = {'quarter': 5, 'half': 5, 'slice': 4}
+
+
+@pytest.fixture(scope='module', params=sorted(RADIUS))
+def problem(request, tmp_path_factory):
+    """An env and a heuristic that is exact up to ``radius + 1`` moves from solved."""
+    action_set = request.param
+    env = RubiksCubeEnv(action_set=action_set)
+    env.set_scramble(5, 6)
+    radius = RADIUS[action_set]
+    index = build_neighborhood(str(tmp_path_factory.mktemp(action_set)), radius, moves=env.moves)
+
+    def heuristic(states):
+        distance = index.distance(states)
+        return np.where(distance == UNKNOWN, radius + 1, distance)
+    return env, heuristic
+
+
+def replay_solves(env, solution):
+    done = False
+    for action in solution:
+        assert not done
+        done = env.step(action)[2]
+    return done
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_astar_solves_scrambles(problem, seed):
+    env, heuristic = problem
+    state = env.reset(seed=seed)
+    result = batch_weighted_astar(state, heuristic, weight=1.0, batch_size=100, moves=env.moves)
+    assert result.solution is not None
+    assert replay_solves(env, result.solution)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_beam_search_solves_scrambles(problem, seed):
+    env, heuristic = problem
+    state = env.reset(seed=seed)
+    result = beam_search(state, heuristic, beam_width=100, moves=env.moves)
+    assert result.solution is not None
+    assert replay_solves(env, result.solution)
+
+
+def test_astar_stops_at_max_nodes():
+    env = RubiksCubeEnv()
+    env.set_scramble(20, 20)
+    state = env.reset(seed=0)
+    result = batch_weighted_astar(state, lambda states: np.zeros(len(states)), batch_size=64,
+                                  max_nodes=500)
+    assert result.solution is None
+    assert result.nodes_expanded == 500